@@ -0,0 +1,30 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+_local = threading.local()
+
+
+@contextmanager
+def request_deadline(deadline_at: float) -> Iterator[None]:
+    """
+    Sets the monotonic deadline for requests made from the current thread.
+    """
+    previous = getattr(_local, "deadline_at", None)
+    _local.deadline_at = deadline_at
+    try:
+        yield
+    finally:
+        _local.deadline_at = previous
+
+
+def remaining_time() -> float | None:
+    """
+    Seconds left before the current thread's deadline, or None without one.
+    """
+    deadline_at = getattr(_local, "deadline_at", None)
+    if deadline_at is None:
+        return None
+    return max(0.001, deadline_at - time.monotonic())
@@ -1,17 +1,46 @@
 import os
 from functools import lru_cache
 from minio import Minio
+import urllib3
+
+from providers.deadline import remaining_time
 
 
 APP_HOST = os.getenv("APP_HOST", "localhost")
 MINIO_HOST = os.getenv("MINIO_HOST", APP_HOST)
+MINIO_CONNECT_TIMEOUT = float(os.getenv("MINIO_CONNECT_TIMEOUT", "5"))
+MINIO_READ_TIMEOUT = float(os.getenv("MINIO_READ_TIMEOUT", "20"))
+
+
+class DeadlinePoolManager(urllib3.PoolManager):
+    """
+    Pool manager that shortens socket timeouts to the time left before the
+    calling thread's request deadline (see `providers.deadline`).
+    """
+
+    def urlopen(self, method, url, redirect=True, **kw):
+        remaining = remaining_time()
+        if remaining is not None:
+            kw["timeout"] = urllib3.Timeout(
+                total=remaining,
+                connect=min(MINIO_CONNECT_TIMEOUT, remaining),
+                read=min(MINIO_READ_TIMEOUT, remaining),
+            )
+        return super().urlopen(method, url, redirect=redirect, **kw)
 
 
 @lru_cache(maxsize=1)
 def get_minio_client():
+    # Retries are handled by the transfer layer, so urllib3 only enforces socket timeouts
+    http_client = DeadlinePoolManager(
+        timeout=urllib3.Timeout(connect=MINIO_CONNECT_TIMEOUT, read=MINIO_READ_TIMEOUT),
+        maxsize=32,
+        retries=False,
+    )
     return Minio(
         endpoint=f"{MINIO_HOST}:9000",
         access_key=os.getenv("MINIO_ROOT_USER", "minioadmin"),
         secret_key=os.getenv("MINIO_ROOT_PASSWORD", "minioadmin"),
         secure=False,
-    )
\ No newline at end of file
+        http_client=http_client,
+    )
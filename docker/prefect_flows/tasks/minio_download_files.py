@@ -3,57 +3,90 @@ from logging import Logger, LoggerAdapter
 
 from prefect import task, get_run_logger
 from minio import Minio
-from minio.error import S3Error
 
 from providers.minio import get_minio_client
+from tasks.minio_transfer import (
+    Attempt,
+    TransferPolicy,
+    TransferResult,
+    default_policy,
+    get_latency_tracker,
+    read_stream,
+    run_transfer,
+    summarize_transfers,
+)
 
 
 def download_object(
     client: Minio,
     bucket_name: str,
     object_name: str | None,
-    logger: Logger | LoggerAdapter
-) -> bytes | None:
+    logger: Logger | LoggerAdapter,
+    policy: TransferPolicy | None = None
+) -> TransferResult | None:
     if object_name is None:
         return None
 
-    try:
-        logger.debug(f"Downloading {object_name} from bucket '{bucket_name}'")
+    def get(attempt: Attempt) -> bytes:
+        attempt.check()
+        # get_object streams the body, read_stream stops it at the attempt deadline
         response = client.get_object(bucket_name, object_name)
-        data = response.read()
-        response.close()
-        response.release_conn()
+        try:
+            return read_stream(response, attempt)
+        finally:
+            response.close()
+            response.release_conn()
+
+    logger.debug(f"Downloading {object_name} from bucket '{bucket_name}'")
+    result = run_transfer(
+        object_name=object_name,
+        fn=get,
+        policy=policy or default_policy(),
+        logger=logger,
+        tracker=get_latency_tracker(f"get:{bucket_name}")
+    )
+    if result["status"] == "ok":
         logger.debug(f"Downloaded {object_name} successfully")
-        return data
-    except (S3Error, Exception) as e:
-        logger.error(f"Failed to download '{object_name}': {e}")
-        return None
+    return result
 
 
 @task(name="minio_download_file_task", log_prints=False)
-def download_file_task(bucket_name: str, object_name: str) -> bytes:
+def download_file_task(
+    bucket_name: str,
+    object_name: str,
+    hedge_percentile: float | None = 0.95
+) -> bytes:
     """
     Downloads a single file from a specified MinIO bucket.
     """
     minio_client = get_minio_client()
     logger = get_run_logger()
 
-    data = download_object(minio_client, bucket_name, object_name, logger)
-    if data is None:
-        raise RuntimeError(f"Download failed for '{object_name}' in '{bucket_name}'")
+    policy = default_policy(hedge_percentile=hedge_percentile)
+    result = download_object(minio_client, bucket_name, object_name, logger, policy)
+    if result is None or result["status"] != "ok":
+        error = result["error"] if result else None
+        raise RuntimeError(f"Download failed for '{object_name}' in '{bucket_name}': {error}")
 
     logger.info(f"✅ Download complete: {object_name}")
-    return data
+    return result["value"]
 
 
 @task(name="minio_download_files_task", log_prints=False)
 def download_files_task(
     bucket_name: str,
     filter_extensions: tuple[str] | None = None,
-    max_workers: int = 5
+    max_workers: int = 5,
+    deadline: float = 60.0,
+    max_attempts: int = 3,
+    hedge_percentile: float | None = 0.95
 ) -> list[bytes]:
     """
     Downloads all files from a specified MinIO bucket in parallel.
+
+    Each object gets its own deadline and retry budget, and a duplicate GET is sent
+    when the first byte takes longer than the `hedge_percentile` of recent
+    first-byte latencies for the bucket.
     """
     logger = get_run_logger()
     minio_client = get_minio_client()
@@ -67,18 +100,28 @@ def download_files_task(
         ]
     logger.info(f"Found {len(objects)} files in bucket '{bucket_name}'")
 
+    policy = default_policy(
+        deadline=deadline,
+        max_attempts=max_attempts,
+        hedge_percentile=hedge_percentile
+    )
     files_data: list[bytes] = []
+    results: list[TransferResult] = []
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         future_to_obj = {
-            executor.submit(download_object, minio_client, bucket_name, obj.object_name, logger): obj
+            executor.submit(download_object, minio_client, bucket_name, obj.object_name, logger, policy): obj
             for obj in objects
         }
 
         for future in as_completed(future_to_obj):
-            data = future.result()
-            if data:
-                files_data.append(data)
-
+            result = future.result()
+            if result is None:
+                continue
+            results.append(result)
+            if result["status"] == "ok" and result["value"]:
+                files_data.append(result["value"])
+
+    summarize_transfers(results, "Download", logger)
     logger.info(f"✅ Successfully downloaded {len(files_data)} files from '{bucket_name}'")
     return files_data
@@ -0,0 +1,385 @@
+import time
+import queue
+import socket
+import random
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Literal, TypeVar, TypedDict
+from logging import Logger, LoggerAdapter
+
+from minio.error import S3Error
+from urllib3.exceptions import TimeoutError as HTTPTimeoutError
+
+from providers.deadline import request_deadline
+
+
+T = TypeVar("T")
+
+TransferStatus = Literal["ok", "failed", "timeout"]
+
+# S3 error codes that will not succeed on retry
+NON_RETRYABLE_CODES = {
+    "NoSuchKey",
+    "NoSuchBucket",
+    "AccessDenied",
+    "InvalidAccessKeyId",
+    "SignatureDoesNotMatch",
+    "InvalidBucketName",
+}
+
+# Upper bound on hedged duplicates alive across the process, so a slow MinIO
+# never receives more than this many extra requests
+MAX_INFLIGHT_HEDGES = 8
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class TransferPolicy(TypedDict):
+    deadline: float
+    attempt_timeout: float
+    max_attempts: int
+    base_delay: float
+    max_delay: float
+    hedge_percentile: float | None
+
+
+class TransferResult(TypedDict):
+    object_name: str
+    status: TransferStatus
+    attempts: int
+    elapsed: float
+    error: str | None
+    value: Any
+
+
+def default_policy(**overrides: Any) -> TransferPolicy:
+    policy = TransferPolicy(
+        deadline=60.0,
+        attempt_timeout=20.0,
+        max_attempts=3,
+        base_delay=0.2,
+        max_delay=5.0,
+        hedge_percentile=None,
+    )
+    policy.update(overrides)  # type: ignore[typeddict-item]
+    return policy
+
+
+class AttemptCancelled(Exception):
+    pass
+
+
+class LatencyTracker:
+    """
+    Keeps a sliding window of time-to-first-byte samples to pick a hedge delay.
+
+    First-byte latency does not grow with object size, so large objects are not
+    hedged just for taking longer to stream.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, p: float) -> float | None:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(p * len(ordered)))
+        return ordered[index]
+
+
+@lru_cache(maxsize=None)
+def get_latency_tracker(operation: str) -> LatencyTracker:
+    return LatencyTracker()
+
+
+@lru_cache(maxsize=1)
+def get_hedge_slots() -> threading.BoundedSemaphore:
+    return threading.BoundedSemaphore(MAX_INFLIGHT_HEDGES)
+
+
+class Attempt:
+    """
+    A single request attempt, run in its own thread.
+
+    While it runs, MinIO requests made from its thread get socket timeouts no
+    longer than the time left before `deadline_at`, and `read_stream` stops
+    between chunks once the deadline passes.
+    """
+
+    def __init__(
+        self,
+        deadline_at: float,
+        tracker: LatencyTracker | None = None,
+        hedged: bool = False
+    ) -> None:
+        self.deadline_at = deadline_at
+        self.tracker = tracker
+        self.hedged = hedged
+        self.started = time.monotonic()
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        # Set on the first byte or when the attempt ends, whichever comes first
+        self.progressed = threading.Event()
+        self._first_byte = False
+
+    def check(self) -> None:
+        """
+        Raises if the attempt was cancelled or ran past its deadline.
+        """
+        if self.cancelled.is_set():
+            raise AttemptCancelled("Attempt cancelled after another attempt succeeded")
+        if time.monotonic() >= self.deadline_at:
+            raise TimeoutError(f"Request exceeded its deadline after {time.monotonic() - self.started:.1f}s")
+
+    def mark_first_byte(self) -> None:
+        if self._first_byte:
+            return
+        self._first_byte = True
+        # Hedged duplicates only win when the primary was slow, recording them
+        # would skew the window towards fast samples
+        if self.tracker is not None and not self.hedged:
+            self.tracker.record(time.monotonic() - self.started)
+        self.progressed.set()
+
+
+def read_stream(response: Any, attempt: Attempt, chunk_size: int = STREAM_CHUNK_SIZE) -> bytes:
+    """
+    Reads a streamed (`preload_content=False`) response, checking the attempt
+    between chunks so a slow trickle of data cannot run past the deadline.
+    """
+    attempt.check()
+    attempt.mark_first_byte()
+
+    chunks: list[bytes] = []
+    for chunk in response.stream(chunk_size):
+        attempt.check()
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def is_timeout(error: BaseException) -> bool:
+    # urllib3's ReadTimeoutError/ConnectTimeoutError derive from its own TimeoutError
+    return isinstance(error, (TimeoutError, socket.timeout, HTTPTimeoutError))
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, S3Error):
+        return error.code not in NON_RETRYABLE_CODES
+    return True
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    Full-jitter exponential backoff for the given (1-based) attempt.
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** (attempt - 1))))
+
+
+def _run_attempt(
+    fn: Callable[[Attempt], T],
+    deadline_at: float,
+    hedge_delay: float | None,
+    tracker: LatencyTracker | None,
+    inflight: list[Attempt]
+) -> T:
+    results: queue.Queue[tuple[Attempt, Any, BaseException | None]] = queue.Queue()
+
+    def run(attempt: Attempt, release: Callable[[], None] | None = None) -> None:
+        try:
+            with request_deadline(attempt.deadline_at):
+                value = fn(attempt)
+            results.put((attempt, value, None))
+        except BaseException as e:
+            results.put((attempt, None, e))
+        finally:
+            attempt.finished.set()
+            attempt.progressed.set()
+            if release is not None:
+                release()
+
+    def start(attempt: Attempt, release: Callable[[], None] | None = None) -> None:
+        attempts.append(attempt)
+        inflight.append(attempt)
+        threading.Thread(target=run, args=(attempt, release), daemon=True).start()
+
+    attempts: list[Attempt] = []
+    primary = Attempt(deadline_at, tracker)
+    start(primary)
+
+    # Fire one duplicate if the primary has not responded within the hedge delay.
+    # Hedges are capped process-wide, when all slots are busy the primary runs alone.
+    if hedge_delay is not None and hedge_delay < deadline_at - time.monotonic():
+        if not primary.progressed.wait(hedge_delay):
+            slots = get_hedge_slots()
+            if slots.acquire(blocking=False):
+                start(Attempt(deadline_at, tracker, hedged=True), slots.release)
+
+    # Never wait past the deadline, even if a request is stuck in a blocking call
+    error: BaseException | None = None
+    pending = len(attempts)
+    while pending:
+        try:
+            _, value, e = results.get(timeout=max(0.0, deadline_at - time.monotonic()))
+        except queue.Empty:
+            break
+        pending -= 1
+        if e is None:
+            for attempt in attempts:
+                attempt.cancelled.set()
+            return value
+        if error is None or isinstance(error, AttemptCancelled):
+            error = e
+
+    for attempt in attempts:
+        attempt.cancelled.set()
+    if not pending and error is not None:
+        raise error
+    raise TimeoutError("Request did not complete before its deadline")
+
+
+def run_transfer(
+    object_name: str,
+    fn: Callable[[Attempt], T],
+    policy: TransferPolicy,
+    logger: Logger | LoggerAdapter,
+    tracker: LatencyTracker | None = None
+) -> TransferResult:
+    """
+    Runs a MinIO request with a deadline, jittered exponential-backoff retries
+    and optional hedging.
+
+    Returns within `policy["deadline"]` of being called, whatever the backend does.
+    An attempt still blocked at its deadline keeps running in its own thread, but
+    every socket operation it starts times out within the attempt budget left when
+    the request was sent (see `providers.minio.DeadlinePoolManager`), so it ends at
+    most about two attempt budgets after it started. A retry waits for such an
+    attempt to end and is skipped if it outlives the object deadline, so an object
+    never has more than two requests (the primary and one hedge) in flight.
+
+    Args:
+        object_name (str): Object being transferred, used for reporting.
+        fn (Callable): Performs one complete request. Streamed reads should go
+            through `read_stream`, and it must be safe to run concurrently when
+            hedging is enabled.
+        policy (TransferPolicy): Deadline, retry and hedging settings.
+        logger (Logger | LoggerAdapter): Logger for retry and failure messages.
+        tracker (LatencyTracker | None): First-byte latency history used to pick
+            the hedge delay. Hedging is disabled without one.
+
+    Returns:
+        TransferResult: Final status of the object, with the value on success.
+    """
+    started = time.monotonic()
+    deadline_at = started + policy["deadline"]
+    status: TransferStatus = "failed"
+    error: BaseException | None = None
+    inflight: list[Attempt] = []
+    attempt = 0
+
+    while attempt < policy["max_attempts"]:
+        now = time.monotonic()
+        if now >= deadline_at:
+            status = "timeout"
+            break
+
+        # Do not pile more requests onto an attempt that is still stuck, give it
+        # until the overall deadline to end before retrying
+        for earlier in inflight:
+            earlier.finished.wait(max(0.0, deadline_at - time.monotonic()))
+        inflight = [a for a in inflight if not a.finished.is_set()]
+        if inflight:
+            status = "timeout"
+            logger.warning(f"Not retrying '{object_name}', an earlier attempt is still running")
+            break
+        now = time.monotonic()
+        if now >= deadline_at:
+            status = "timeout"
+            break
+
+        attempt += 1
+        hedge_delay = None
+        if tracker is not None and policy["hedge_percentile"] is not None:
+            hedge_delay = tracker.percentile(policy["hedge_percentile"])
+
+        try:
+            # The attempt deadline is measured from when the attempt actually starts
+            attempt_deadline = min(deadline_at, now + policy["attempt_timeout"])
+            value = _run_attempt(fn, attempt_deadline, hedge_delay, tracker, inflight)
+            return TransferResult(
+                object_name=object_name,
+                status="ok",
+                attempts=attempt,
+                elapsed=time.monotonic() - started,
+                error=None,
+                value=value
+            )
+        except Exception as e:
+            error = e
+            status = "timeout" if is_timeout(e) else "failed"
+            if not is_retryable(e):
+                break
+            if attempt >= policy["max_attempts"]:
+                break
+
+            delay = backoff_delay(attempt, policy["base_delay"], policy["max_delay"])
+            delay = min(delay, max(0.0, deadline_at - time.monotonic()))
+            logger.warning(
+                f"Attempt {attempt}/{policy['max_attempts']} for '{object_name}' failed: {e}. "
+                f"Retrying in {delay:.2f}s"
+            )
+            time.sleep(delay)
+
+    if status == "timeout" and error is None:
+        error = TimeoutError(f"Deadline of {policy['deadline']:.1f}s exceeded")
+
+    logger.error(f"Transfer of '{object_name}' {status} after {attempt} attempt(s): {error}")
+    return TransferResult(
+        object_name=object_name,
+        status=status,
+        attempts=attempt,
+        elapsed=time.monotonic() - started,
+        error=str(error) if error is not None else None,
+        value=None
+    )
+
+
+def summarize_transfers(
+    results: list[TransferResult],
+    operation: str,
+    logger: Logger | LoggerAdapter
+) -> None:
+    """
+    Logs per-status counts, latency percentiles and every object that did not succeed.
+    """
+    if not results:
+        return
+
+    counts: dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+
+    elapsed = sorted(result["elapsed"] for result in results)
+    p50 = elapsed[min(len(elapsed) - 1, int(0.50 * len(elapsed)))]
+    p99 = elapsed[min(len(elapsed) - 1, int(0.99 * len(elapsed)))]
+    retried = sum(1 for result in results if result["attempts"] > 1)
+
+    status_text = ", ".join(f"{status}={count}" for status, count in sorted(counts.items()))
+    logger.info(
+        f"📊 {operation} status: {status_text}, retried={retried}, "
+        f"p50={p50:.2f}s, p99={p99:.2f}s"
+    )
+    for result in results:
+        if result["status"] != "ok":
+            logger.warning(
+                f"{operation} {result['status']}: '{result['object_name']}' "
+                f"after {result['attempts']} attempt(s) — {result['error']}"
+            )
@@ -5,9 +5,16 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from prefect import task, get_run_logger
 from minio import Minio
-from minio.error import S3Error
 
 from providers.minio import get_minio_client
+from tasks.minio_transfer import (
+    Attempt,
+    TransferPolicy,
+    TransferResult,
+    default_policy,
+    run_transfer,
+    summarize_transfers,
+)
 
 
 class FileToUpload(TypedDict):
@@ -19,25 +26,36 @@ class FileToUpload(TypedDict):
 def upload_object(
     client: Minio,
     bucket_name: str, file: FileToUpload,
-    logger: Logger | LoggerAdapter
-) -> str | None:
-    minio_client = get_minio_client()
-
-    try:
-        logger.debug(f"Uploading {file['object_name']} to bucket '{bucket_name}'")
-        stream = BytesIO(file["data"])
-        minio_client.put_object(
+    logger: Logger | LoggerAdapter,
+    policy: TransferPolicy | None = None
+) -> TransferResult:
+    def put(attempt: Attempt) -> str:
+        # Socket timeouts for the request are derived from the attempt deadline
+        attempt.check()
+        # Fresh stream per attempt so a retry never resumes from a consumed buffer
+        client.put_object(
             bucket_name=bucket_name,
             object_name=file["object_name"],
-            data=stream,
+            data=BytesIO(file["data"]),
             length=len(file["data"]),
             content_type=file["content_type"] or "application/octet-stream",
         )
-        logger.debug(f"Uploaded {file['object_name']} to bucket '{bucket_name}'")
         return file["object_name"]
-    except (S3Error, Exception) as e:
-        logger.error(f"Failed to upload '{file['object_name']}': {e}")
-        return None
+
+    # Uploads are never hedged, duplicate PUTs only add load
+    upload_policy = TransferPolicy(**(policy or default_policy()))
+    upload_policy["hedge_percentile"] = None
+
+    logger.debug(f"Uploading {file['object_name']} to bucket '{bucket_name}'")
+    result = run_transfer(
+        object_name=file["object_name"],
+        fn=put,
+        policy=upload_policy,
+        logger=logger
+    )
+    if result["status"] == "ok":
+        logger.debug(f"Uploaded {file['object_name']} to bucket '{bucket_name}'")
+    return result
 
 
 @task(name="minio_upload_file_task", log_prints=True)
@@ -48,18 +66,29 @@ def upload_file_task(bucket_name: str, file: FileToUpload) -> str:
     minio_client = get_minio_client()
     logger = get_run_logger()
 
-    obj_name = upload_object(minio_client, bucket_name, file, logger)
-    if obj_name is None:
-        raise RuntimeError(f"Upload failed for '{file['object_name']}' to '{bucket_name}'")
+    result = upload_object(minio_client, bucket_name, file, logger)
+    if result["status"] != "ok":
+        raise RuntimeError(
+            f"Upload failed for '{file['object_name']}' to '{bucket_name}': {result['error']}"
+        )
 
     logger.info(f"✅ Uploaded {file['object_name']} to bucket {bucket_name} complete.")
-    return obj_name
+    return result["value"]
 
 
 @task(name="minio_upload_files_task", log_prints=True)
-def upload_files_task(bucket_name: str, files: list[FileToUpload], max_workers: int = 5) -> list[str]:
+def upload_files_task(
+    bucket_name: str,
+    files: list[FileToUpload],
+    max_workers: int = 5,
+    deadline: float = 60.0,
+    max_attempts: int = 3
+) -> list[str]:
     """
     Prefect task: Upload multiple files to a MinIO bucket in parallel.
+
+    Each file gets its own deadline and retry budget, and the final status of
+    every file is reported once the batch completes.
     """
     minio_client = get_minio_client()
     logger = get_run_logger()
@@ -67,17 +96,21 @@ def upload_files_task(bucket_name: str, files: list[FileToUpload], max_workers:
     total_files = len(files)
     logger.info(f"🚀 Uploading {total_files} files to '{bucket_name}' with {max_workers} workers...")
 
-    results = []
+    policy = default_policy(deadline=deadline, max_attempts=max_attempts)
+    results: list[str] = []
+    transfers: list[TransferResult] = []
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         futures = {
-            executor.submit(upload_object, minio_client, bucket_name, file, logger): file['object_name']
+            executor.submit(upload_object, minio_client, bucket_name, file, logger, policy): file['object_name']
             for file in files
         }
 
         for future in as_completed(futures):
             result = future.result()
-            if result:
-                results.append(result)
+            transfers.append(result)
+            if result["status"] == "ok":
+                results.append(result["value"])
 
+    summarize_transfers(transfers, "Upload", logger)
     logger.info(f"✅ Upload complete — {len(results)}/{total_files} successful.")
     return results
@@ -0,0 +1,73 @@
+import os
+import sys
+import types
+import logging
+import importlib.util
+
+# Flows import their modules relative to docker/prefect_flows (see run.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Light stand-ins for the train dependencies, used only when they are not
+# installed so the transfer logic can be tested in a plain environment.
+
+def _module(name: str, **attrs) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+if importlib.util.find_spec("minio") is None:
+    class S3Error(Exception):
+        def __init__(self, code, message, resource=None, request_id=None, host_id=None,
+                     response=None, bucket_name=None, object_name=None):
+            super().__init__(message)
+            self.code = code
+
+    _module("minio", Minio=object)
+    sys.modules["minio"].error = _module("minio.error", S3Error=S3Error)
+
+if importlib.util.find_spec("urllib3") is None:
+    class HTTPTimeoutError(Exception):
+        pass
+
+    class ReadTimeoutError(HTTPTimeoutError):
+        pass
+
+    class ConnectTimeoutError(HTTPTimeoutError):
+        pass
+
+    class PoolManager:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def urlopen(self, method, url, redirect=True, **kw):
+            raise NotImplementedError
+
+    class Timeout:
+        def __init__(self, total=None, connect=None, read=None):
+            self.total = total
+            self.connect = connect
+            self.read = read
+
+    _module("urllib3", PoolManager=PoolManager, Timeout=Timeout)
+    sys.modules["urllib3"].exceptions = _module(
+        "urllib3.exceptions",
+        TimeoutError=HTTPTimeoutError,
+        ReadTimeoutError=ReadTimeoutError,
+        ConnectTimeoutError=ConnectTimeoutError,
+    )
+
+if importlib.util.find_spec("prefect") is None:
+    def task(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+    _module(
+        "prefect",
+        task=task,
+        flow=task,
+        get_run_logger=lambda: logging.getLogger("prefect"),
+    )
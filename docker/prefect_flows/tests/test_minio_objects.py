@@ -0,0 +1,139 @@
+import time
+import logging
+import threading
+
+from minio.error import S3Error
+
+from tasks.minio_transfer import default_policy
+from tasks.minio_download_files import download_object
+from tasks.minio_upload_files import upload_object, FileToUpload
+
+
+logger = logging.getLogger(__name__)
+
+
+def fast_policy(**overrides):
+    return default_policy(base_delay=0.01, max_delay=0.02, **overrides)
+
+
+class FakeResponse:
+    def __init__(self, chunks: list[bytes], fail_after: int | None = None) -> None:
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.closed = False
+        self.released = False
+
+    def stream(self, amt):
+        for i, chunk in enumerate(self.chunks):
+            if self.fail_after is not None and i >= self.fail_after:
+                raise ConnectionResetError("reset")
+            yield chunk
+
+    def read(self):
+        raise AssertionError("download must stream instead of reading the whole body")
+
+    def close(self):
+        self.closed = True
+
+    def release_conn(self):
+        self.released = True
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.responses: list[FakeResponse] = []
+        self.get_error: Exception | None = None
+        self.puts: list[tuple[int, bytes]] = []
+        self.put_errors: list[Exception] = []
+        self.put_delay = 0.0
+        self.active_puts = 0
+        self.peak_puts = 0
+        self._lock = threading.Lock()
+
+    def get_object(self, bucket_name, object_name):
+        if self.get_error is not None:
+            raise self.get_error
+        return self.responses.pop(0)
+
+    def put_object(self, bucket_name, object_name, data, length, content_type):
+        with self._lock:
+            self.active_puts += 1
+            self.peak_puts = max(self.peak_puts, self.active_puts)
+        try:
+            self.puts.append((id(data), data.read()))
+            time.sleep(self.put_delay)
+            if self.put_errors:
+                raise self.put_errors.pop(0)
+        finally:
+            with self._lock:
+                self.active_puts -= 1
+
+
+def make_file() -> FileToUpload:
+    return FileToUpload(object_name="a.jpg", data=b"image-bytes", content_type="image/jpg")
+
+
+def test_download_streams_and_releases_connection():
+    client = FakeClient()
+    response = FakeResponse([b"ab", b"cd"])
+    client.responses.append(response)
+
+    result = download_object(client, "bucket-stream", "a.jpg", logger, fast_policy())
+
+    assert result is not None
+    assert result["status"] == "ok"
+    assert result["value"] == b"abcd"
+    assert response.closed and response.released
+
+
+def test_download_releases_connection_on_failure_and_retries():
+    client = FakeClient()
+    failing = FakeResponse([b"ab", b"cd"], fail_after=1)
+    succeeding = FakeResponse([b"ab", b"cd"])
+    client.responses.extend([failing, succeeding])
+
+    result = download_object(client, "bucket-retry", "a.jpg", logger, fast_policy())
+
+    assert result is not None
+    assert result["status"] == "ok"
+    assert result["attempts"] == 2
+    assert failing.closed and failing.released
+    assert succeeding.closed and succeeding.released
+
+
+def test_download_missing_object_is_not_retried():
+    client = FakeClient()
+    client.get_error = S3Error("NoSuchKey", "missing", "a.jpg", "req", "host", None)
+
+    result = download_object(client, "bucket-missing", "a.jpg", logger, fast_policy())
+
+    assert result is not None
+    assert result["status"] == "failed"
+    assert result["attempts"] == 1
+
+
+def test_download_without_object_name():
+    assert download_object(FakeClient(), "bucket", None, logger) is None
+
+
+def test_upload_uses_fresh_stream_per_retry():
+    client = FakeClient()
+    client.put_errors.append(ConnectionResetError("reset"))
+
+    result = upload_object(client, "bucket", make_file(), logger, fast_policy())
+
+    assert result["status"] == "ok"
+    assert result["value"] == "a.jpg"
+    assert result["attempts"] == 2
+    assert [data for _, data in client.puts] == [b"image-bytes", b"image-bytes"]
+
+
+def test_upload_is_never_hedged():
+    client = FakeClient()
+    client.put_delay = 0.1
+
+    result = upload_object(client, "bucket", make_file(), logger, fast_policy(hedge_percentile=0.01))
+
+    assert result["status"] == "ok"
+    assert len(client.puts) == 1
+    assert client.peak_puts == 1
@@ -0,0 +1,259 @@
+import time
+import socket
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from minio.error import S3Error
+from urllib3.exceptions import ReadTimeoutError
+
+from providers.deadline import remaining_time
+from tasks.minio_transfer import (
+    Attempt,
+    LatencyTracker,
+    default_policy,
+    read_stream,
+    run_transfer,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def fast_policy(**overrides):
+    return default_policy(base_delay=0.01, max_delay=0.02, **overrides)
+
+
+def stalled(attempt: Attempt) -> bytes:
+    """
+    A backend that never answers but honours the attempt deadline.
+    """
+    while True:
+        attempt.check()
+        time.sleep(0.01)
+
+
+def warm_tracker(latency: float = 0.01) -> LatencyTracker:
+    tracker = LatencyTracker(min_samples=3)
+    for _ in range(5):
+        tracker.record(latency)
+    return tracker
+
+
+def test_retry_then_succeed():
+    calls = []
+
+    def flaky(attempt: Attempt) -> str:
+        calls.append(attempt)
+        if len(calls) < 3:
+            raise ConnectionResetError("reset")
+        return "ok"
+
+    result = run_transfer("a", flaky, fast_policy(), logger)
+
+    assert result["status"] == "ok"
+    assert result["attempts"] == 3
+    assert result["value"] == "ok"
+
+
+def test_non_retryable_error_stops_immediately():
+    calls = []
+
+    def missing(attempt: Attempt) -> str:
+        calls.append(attempt)
+        raise S3Error("NoSuchKey", "missing", "a", "req", "host", None)
+
+    result = run_transfer("a", missing, fast_policy(), logger)
+
+    assert result["status"] == "failed"
+    assert result["attempts"] == 1
+    assert len(calls) == 1
+
+
+def test_deadline_exhaustion_times_out():
+    result = run_transfer(
+        "a", stalled, fast_policy(deadline=0.3, attempt_timeout=0.1), logger
+    )
+
+    assert result["status"] == "timeout"
+    assert result["value"] is None
+    assert result["elapsed"] < 0.6
+
+
+def test_slow_stream_is_bounded_by_deadline():
+    class TrickleResponse:
+        def stream(self, amt):
+            while True:
+                time.sleep(0.02)
+                yield b"x"
+
+    def trickle(attempt: Attempt) -> bytes:
+        return read_stream(TrickleResponse(), attempt)
+
+    started = time.monotonic()
+    result = run_transfer(
+        "a", trickle, fast_policy(deadline=0.2, attempt_timeout=0.2, max_attempts=1), logger
+    )
+
+    assert result["status"] == "timeout"
+    assert time.monotonic() - started < 0.5
+
+
+def test_hedge_fires_and_first_success_wins():
+    tracker = warm_tracker()
+    calls = []
+    lock = threading.Lock()
+
+    def slow_primary(attempt: Attempt) -> str:
+        with lock:
+            calls.append(attempt)
+            first = len(calls) == 1
+        if first:
+            stalled(attempt)
+        attempt.mark_first_byte()
+        return "hedge"
+
+    result = run_transfer("a", slow_primary, fast_policy(hedge_percentile=0.9), logger, tracker)
+
+    assert result["status"] == "ok"
+    assert result["value"] == "hedge"
+    assert len(calls) == 2
+    assert calls[1].hedged
+    # The loser is told to stop instead of running on in the background
+    assert calls[0].cancelled.is_set()
+
+
+def test_hedged_samples_are_not_recorded():
+    tracker = LatencyTracker(min_samples=1)
+    Attempt(time.monotonic() + 1, tracker, hedged=True).mark_first_byte()
+    assert tracker.percentile(0.5) is None
+
+    Attempt(time.monotonic() + 1, tracker).mark_first_byte()
+    assert tracker.percentile(0.5) is not None
+
+
+def test_no_hedge_once_first_byte_arrived():
+    tracker = warm_tracker()
+    calls = []
+
+    def large_object(attempt: Attempt) -> str:
+        calls.append(attempt)
+        attempt.mark_first_byte()
+        # Streaming takes far longer than the first-byte latency
+        time.sleep(0.1)
+        return "data"
+
+    result = run_transfer("a", large_object, fast_policy(hedge_percentile=0.9), logger, tracker)
+
+    assert result["status"] == "ok"
+    assert len(calls) == 1
+
+
+def test_blocking_call_returns_at_deadline():
+    calls = []
+
+    def blocking_put(attempt: Attempt) -> str:
+        # Blocks like a stuck socket, never calls attempt.check()
+        calls.append(attempt)
+        time.sleep(1)
+        return "late"
+
+    started = time.monotonic()
+    result = run_transfer("a", blocking_put, fast_policy(deadline=0.2, attempt_timeout=0.1), logger)
+
+    assert result["status"] == "timeout"
+    assert time.monotonic() - started < 0.4
+    # No retry is stacked on top of the attempt that is still blocked
+    assert len(calls) == 1
+
+
+def test_retry_waits_for_blocked_attempt_to_end():
+    calls = []
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow_then_fast(attempt: Attempt) -> str:
+        with lock:
+            calls.append(attempt)
+            running.append(attempt)
+            peak.append(len(running))
+            first = len(calls) == 1
+        try:
+            if first:
+                time.sleep(0.15)
+            return "ok"
+        finally:
+            with lock:
+                running.remove(attempt)
+
+    result = run_transfer("a", slow_then_fast, fast_policy(deadline=1, attempt_timeout=0.1), logger)
+
+    assert result["status"] == "ok"
+    assert result["attempts"] == 2
+    assert max(peak) == 1
+
+
+def test_attempt_sets_request_deadline():
+    seen = []
+
+    def fn(attempt: Attempt) -> str:
+        seen.append(remaining_time())
+        return "ok"
+
+    run_transfer("a", fn, fast_policy(attempt_timeout=0.5), logger)
+
+    assert seen[0] is not None and seen[0] <= 0.5
+    assert remaining_time() is None
+
+
+def test_socket_and_urllib3_timeouts_are_reported_as_timeout():
+    for error in (ReadTimeoutError(None, "/a", "Read timed out"), socket.timeout("timed out")):
+        def fn(attempt: Attempt, error=error) -> str:
+            raise error
+
+        result = run_transfer("a", fn, fast_policy(max_attempts=2), logger)
+
+        assert result["status"] == "timeout"
+        assert result["attempts"] == 2
+
+
+def test_stalled_backend_does_not_starve_other_transfers():
+    tracker = warm_tracker()
+    release = threading.Event()
+    inflight = {}
+    peak = {}
+    lock = threading.Lock()
+
+    def stalled_object(name: str):
+        def fn(attempt: Attempt) -> bytes:
+            with lock:
+                inflight[name] = inflight.get(name, 0) + 1
+                peak[name] = max(peak.get(name, 0), inflight[name])
+            try:
+                # A blocked socket that ignores the attempt entirely
+                release.wait()
+                raise ConnectionResetError("reset")
+            finally:
+                with lock:
+                    inflight[name] -= 1
+        return fn
+
+    policy = fast_policy(deadline=0.4, attempt_timeout=0.2, hedge_percentile=0.9)
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=11) as executor:
+        futures = [
+            executor.submit(run_transfer, f"slow-{i}", stalled_object(f"slow-{i}"), policy, logger, tracker)
+            for i in range(11)
+        ]
+        time.sleep(0.05)
+        fast = run_transfer("fast", lambda attempt: b"ok", policy, logger, tracker)
+        slow_results = [future.result() for future in futures]
+    elapsed = time.monotonic() - started
+    release.set()
+
+    assert fast["status"] == "ok"
+    assert all(result["status"] == "timeout" for result in slow_results)
+    assert elapsed < 0.8
+    # Never more than the primary and one hedge alive for an object
+    assert max(peak.values()) <= 2
@@ -0,0 +1,222 @@
+import os
+import time
+import fnmatch
+import threading
+
+from visocr import cache as cache_module
+from visocr.cache import (
+    DiskStore,
+    ExtractionResult,
+    MemoryStore,
+    RedisStore,
+    ResultCache,
+    content_hash,
+)
+
+
+class FakeRedis:
+    """
+    Dict-backed stand-in for the subset of the redis client used by RedisStore.
+    """
+
+    def __init__(self) -> None:
+        self.data: dict[bytes, bytes] = {}
+        self.expiry: dict[bytes, int | None] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.data.get(key.encode("utf-8"))
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.data[key.encode("utf-8")] = value.encode("utf-8")
+        self.expiry[key.encode("utf-8")] = ex
+
+    def scan_iter(self, match: str):
+        for key in list(self.data):
+            if fnmatch.fnmatch(key.decode("utf-8"), match):
+                yield key
+
+    def delete(self, key: bytes) -> None:
+        self.data.pop(key, None)
+
+
+def make_result(text: str) -> ExtractionResult:
+    return ExtractionResult(layout=[], ocr=[{"text": text}], tables=[])
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryStore(max_size=2)
+    store.set("a", make_result("a"))
+    store.set("b", make_result("b"))
+    store.get("a")
+    store.set("c", make_result("c"))
+
+    assert store.get("a") is not None
+    assert store.get("b") is None
+    assert store.get("c") is not None
+
+
+def test_memory_store_returns_copies():
+    store = MemoryStore()
+    store.set("a", make_result("a"))
+
+    result = store.get("a")
+    assert result is not None
+    result["layout"].append({"label": "title"})
+
+    assert store.get("a") == make_result("a")
+
+
+def test_backend_hit_is_promoted_to_memory(tmp_path):
+    backend = DiskStore(str(tmp_path))
+    ResultCache("v1", backend=backend).set(content_hash(b"page"), make_result("page"))
+
+    cache = ResultCache("v1", backend=backend)
+    calls = []
+    compute = lambda data: calls.append(data) or make_result("fresh")
+
+    assert cache.get_or_compute(b"page", compute) == make_result("page")
+    assert cache.get_or_compute(b"page", compute) == make_result("page")
+    assert calls == []
+    assert cache.stats()["backend_hits"] == 1
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_stats_hit_rate():
+    cache = ResultCache("v1")
+    for data in (b"a", b"a", b"b", b"a"):
+        cache.get_or_compute(data, lambda d: make_result(d.decode("utf-8")))
+
+    stats = cache.stats()
+    assert stats["misses"] == 2
+    assert stats["memory_hits"] == 2
+    assert stats["hit_rate"] == 0.5
+
+    cache.reset_stats()
+    assert cache.stats()["hit_rate"] == 0.0
+
+
+def test_set_model_version_invalidates_memory_and_disk(tmp_path):
+    cache = ResultCache("layout/v1", backend=DiskStore(str(tmp_path)))
+    cache.get_or_compute(b"page", lambda d: make_result("v1"))
+
+    cache.set_model_version("layout:v2")
+    assert cache.get_or_compute(b"page", lambda d: make_result("v2")) == make_result("v2")
+    assert cache.stats()["misses"] == 2
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_version_change_during_compute_is_not_stored(tmp_path):
+    cache = ResultCache("1", backend=DiskStore(str(tmp_path)))
+
+    def compute(data: bytes) -> ExtractionResult:
+        cache.set_model_version("2")
+        return make_result("v1-output")
+
+    assert cache.get_or_compute(b"page", compute) == make_result("v1-output")
+    assert cache.get(content_hash(b"page")) is None
+    assert cache.get(content_hash(b"page"), "1") is None
+
+
+def test_disk_store_clear_ignores_leftover_files(tmp_path):
+    store = DiskStore(str(tmp_path))
+    store.set("v1:abc", make_result("a"))
+    store.set("v2:abc", make_result("b"))
+    version_dir = os.path.dirname(store._file("v1:abc"))
+    open(os.path.join(version_dir, "abc.json.1.2.tmp"), "w").close()
+
+    store.clear(keep_version="v2")
+
+    assert store.get("v1:abc") is None
+    assert store.get("v2:abc") == make_result("b")
+
+
+def test_disk_store_expires_entries(tmp_path):
+    store = DiskStore(str(tmp_path), ttl=60)
+    store.set("v1:abc", make_result("a"))
+    file_path = store._file("v1:abc")
+    os.utime(file_path, (0, 0))
+
+    assert store.get("v1:abc") is None
+    assert not os.path.exists(file_path)
+
+
+def test_disk_store_concurrent_writes(tmp_path):
+    store = DiskStore(str(tmp_path))
+    threads = [
+        threading.Thread(target=store.set, args=("v1:abc", make_result(str(i))))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.get("v1:abc") is not None
+
+
+def test_redis_store_roundtrip_and_clear():
+    client = FakeRedis()
+    store = RedisStore(client, ttl=30)
+    store.set("v1:abc", make_result("a"))
+    store.set("v2:abc", make_result("b"))
+
+    assert store.get("v1:abc") == make_result("a")
+    assert client.expiry[b"visocr:v1:abc"] == 30
+
+    store.clear(keep_version="v2")
+    assert store.get("v1:abc") is None
+    assert store.get("v2:abc") == make_result("b")
+
+
+def test_set_model_version_invalidates_redis():
+    cache = ResultCache("v1", backend=RedisStore(FakeRedis()))
+    cache.get_or_compute(b"page", lambda d: make_result("v1"))
+
+    cache.set_model_version("v2")
+    assert cache.get_or_compute(b"page", lambda d: make_result("v2")) == make_result("v2")
+
+
+def test_clear_matches_exact_version():
+    memory = MemoryStore()
+    redis = RedisStore(FakeRedis())
+    for store in (memory, redis):
+        store.set("v1:abc", make_result("v1"))
+        store.set("v1:beta:abc", make_result("beta"))
+
+        store.clear(keep_version="v1")
+
+        assert store.get("v1:abc") == make_result("v1")
+        assert store.get("v1:beta:abc") is None
+
+
+def test_startup_prunes_other_versions(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "VISOCR_CACHE_BACKEND", "disk")
+    monkeypatch.setattr(cache_module, "VISOCR_CACHE_PATH", str(tmp_path))
+
+    monkeypatch.setattr(cache_module, "VISOCR_MODEL_VERSION", "v1")
+    cache_module.get_result_cache.cache_clear()
+    old = cache_module.get_result_cache()
+    for i in range(5):
+        old.get_or_compute(f"page-{i}".encode(), lambda d: make_result("v1"))
+
+    # Restart with a new version
+    monkeypatch.setattr(cache_module, "VISOCR_MODEL_VERSION", "v2")
+    cache_module.get_result_cache.cache_clear()
+    cache_module.get_result_cache()
+    cache_module.get_result_cache.cache_clear()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_disk_store_sweeps_unread_entries(tmp_path):
+    store = DiskStore(str(tmp_path), ttl=60, sweep_interval=0)
+    store.set("v1:old", make_result("old"))
+    os.utime(store._file("v1:old"), (0, 0))
+
+    store.set("v1:new", make_result("new"))
+
+    deadline = time.monotonic() + 2
+    while os.path.exists(store._file("v1:old")) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not os.path.exists(store._file("v1:old"))
+    assert store.get("v1:new") == make_result("new")
@@ -0,0 +1,365 @@
+'''
+Result cache for the extraction path.
+
+Pages are keyed by a hash of their content plus the model version, so the
+same page arriving inside different documents is only processed once, and
+bumping the model version makes every older entry unreachable.
+'''
+
+import os
+import time
+import json
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Protocol, TypedDict
+
+
+APP_HOST = os.getenv("APP_HOST", "localhost")
+REDIS_HOST = os.getenv("REDIS_HOST", APP_HOST)
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+# DB 0 is used by Prefect messaging, keep cache entries apart from it
+REDIS_DB = int(os.getenv("REDIS_DB", "1"))
+VISOCR_MODEL_VERSION = os.getenv("VISOCR_MODEL_VERSION", "0")
+VISOCR_CACHE_BACKEND = os.getenv("VISOCR_CACHE_BACKEND", "disk")
+VISOCR_CACHE_PATH = os.getenv(
+    "VISOCR_CACHE_PATH",
+    os.path.join(os.getcwd(), ".visocr-cache")
+)
+VISOCR_CACHE_MEMORY_SIZE = int(os.getenv("VISOCR_CACHE_MEMORY_SIZE", "1024"))
+VISOCR_CACHE_TTL = int(os.getenv("VISOCR_CACHE_TTL", str(7 * 24 * 3600)))
+VISOCR_CACHE_SWEEP_INTERVAL = int(os.getenv("VISOCR_CACHE_SWEEP_INTERVAL", "600"))
+
+
+class ExtractionResult(TypedDict):
+    layout: list[dict[str, Any]]
+    ocr: list[dict[str, Any]]
+    tables: list[dict[str, Any]]
+
+
+class CacheStats(TypedDict):
+    memory_hits: int
+    backend_hits: int
+    misses: int
+    hit_rate: float
+
+
+class CacheStore(Protocol):
+    def get(self, key: str) -> ExtractionResult | None: ...
+    def set(self, key: str, value: ExtractionResult) -> None: ...
+    def clear(self, keep_version: str | None = None) -> None: ...
+
+
+def content_hash(data: bytes) -> str:
+    """
+    Returns the SHA-256 hex digest of a page's content.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def key_version(key: str) -> str:
+    """
+    Returns the model version part of a `<model_version>:<page_hash>` key.
+    """
+    return key.rsplit(":", 1)[0]
+
+
+class MemoryStore:
+    """
+    Thread-safe in-memory LRU store.
+
+    Entries are kept as serialized JSON so callers always get their own copy
+    and mutating a returned result never changes the cache.
+    """
+
+    def __init__(self, max_size: int = 1024) -> None:
+        self.max_size = max_size
+        self._data: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> ExtractionResult | None:
+        with self._lock:
+            raw = self._data.get(key)
+            if raw is None:
+                return None
+            self._data.move_to_end(key)
+        return json.loads(raw)
+
+    def set(self, key: str, value: ExtractionResult) -> None:
+        raw = json.dumps(value)
+        with self._lock:
+            self._data[key] = raw
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self, keep_version: str | None = None) -> None:
+        with self._lock:
+            if keep_version is None:
+                self._data.clear()
+                return
+            for key in [k for k in self._data if key_version(k) != keep_version]:
+                del self._data[key]
+
+
+class DiskStore:
+    """
+    On-disk store, one JSON file per entry grouped by model version.
+
+    Entries older than `ttl` seconds are treated as misses, and a background sweep
+    started from `set` at most every `sweep_interval` seconds deletes them, so the
+    store holds at most `ttl` seconds of writes. Without a `ttl` the store grows
+    until `clear` is called.
+    """
+
+    def __init__(self, path: str, ttl: int | None = None, sweep_interval: float = 600) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._last_sweep = time.monotonic()
+        self._sweep_lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    def _version_dir(self, version: str) -> str:
+        # Versions may contain '/' or ':', so the directory name is derived from a hash
+        return os.path.join(self.path, content_hash(version.encode("utf-8"))[:16])
+
+    def _file(self, key: str) -> str:
+        version, digest = key.rsplit(":", 1)
+        return os.path.join(self._version_dir(version), f"{digest}.json")
+
+    def _expired(self, file_path: str) -> bool:
+        if self.ttl is None:
+            return False
+        return time.time() - os.path.getmtime(file_path) > self.ttl
+
+    def get(self, key: str) -> ExtractionResult | None:
+        file_path = self._file(key)
+        try:
+            if self._expired(file_path):
+                os.remove(file_path)
+                return None
+            with open(file_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def set(self, key: str, value: ExtractionResult) -> None:
+        file_path = self._file(key)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        # Write to a temp file first so readers never see a partial entry
+        tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, file_path)
+        self._maybe_sweep()
+
+    def _maybe_sweep(self) -> None:
+        if self.ttl is None:
+            return
+        with self._sweep_lock:
+            if time.monotonic() - self._last_sweep < self.sweep_interval:
+                return
+            self._last_sweep = time.monotonic()
+        threading.Thread(target=self.sweep, daemon=True).start()
+
+    def sweep(self) -> None:
+        """
+        Deletes expired entries, including temp files left by crashed writers.
+        """
+        for name in os.listdir(self.path):
+            version_dir = os.path.join(self.path, name)
+            if not os.path.isdir(version_dir):
+                continue
+            for entry in os.listdir(version_dir):
+                entry_path = os.path.join(version_dir, entry)
+                try:
+                    if self._expired(entry_path):
+                        os.remove(entry_path)
+                except FileNotFoundError:
+                    pass
+
+    def clear(self, keep_version: str | None = None) -> None:
+        keep_dir = self._version_dir(keep_version) if keep_version is not None else None
+        for name in os.listdir(self.path):
+            version_dir = os.path.join(self.path, name)
+            if version_dir != keep_dir:
+                shutil.rmtree(version_dir, ignore_errors=True)
+        self.sweep()
+
+
+class RedisStore:
+    """
+    Redis store, entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, client: Any, ttl: int | None = None, namespace: str = "visocr") -> None:
+        self.client = client
+        self.ttl = ttl
+        self.namespace = namespace
+
+    def get(self, key: str) -> ExtractionResult | None:
+        raw = self.client.get(f"{self.namespace}:{key}")
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    def set(self, key: str, value: ExtractionResult) -> None:
+        self.client.set(f"{self.namespace}:{key}", json.dumps(value), ex=self.ttl)
+
+    def clear(self, keep_version: str | None = None) -> None:
+        prefix = f"{self.namespace}:"
+        for raw_key in self.client.scan_iter(match=f"{prefix}*"):
+            key = raw_key.decode("utf-8") if isinstance(raw_key, bytes) else raw_key
+            if keep_version is None or key_version(key[len(prefix):]) != keep_version:
+                self.client.delete(raw_key)
+
+
+class ResultCache:
+    """
+    Two-tier result cache: an in-memory LRU in front of a shared backend store.
+
+    Keys combine the model version and the page content hash. Changing the
+    model version through `set_model_version` drops stale entries from both tiers.
+    """
+
+    def __init__(
+        self,
+        model_version: str,
+        backend: CacheStore | None = None,
+        memory_size: int = 1024
+    ) -> None:
+        self.model_version = model_version
+        self.memory = MemoryStore(max_size=memory_size)
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._backend_hits = 0
+        self._misses = 0
+
+    def key(self, page_hash: str, model_version: str | None = None) -> str:
+        return f"{model_version or self.model_version}:{page_hash}"
+
+    def get(self, page_hash: str, model_version: str | None = None) -> ExtractionResult | None:
+        key = self.key(page_hash, model_version)
+
+        value = self.memory.get(key)
+        if value is not None:
+            with self._lock:
+                self._memory_hits += 1
+            return value
+
+        if self.backend is not None:
+            value = self.backend.get(key)
+            if value is not None:
+                # Promote to the memory tier for subsequent lookups
+                self.memory.set(key, value)
+                with self._lock:
+                    self._backend_hits += 1
+                return value
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def set(self, page_hash: str, value: ExtractionResult, model_version: str | None = None) -> None:
+        key = self.key(page_hash, model_version)
+        self.memory.set(key, value)
+        if self.backend is not None:
+            self.backend.set(key, value)
+
+    def get_or_compute(
+        self,
+        data: bytes,
+        compute: Callable[[bytes], ExtractionResult]
+    ) -> ExtractionResult:
+        """
+        Returns the cached result for a page, running `compute` only on a miss.
+
+        Args:
+            data (bytes): The page content used for hashing and passed to `compute`.
+            compute (Callable): Renders and runs inference on the page.
+
+        Returns:
+            ExtractionResult: Layout, OCR and table output for the page.
+        """
+        page_hash = content_hash(data)
+        model_version = self.model_version
+        value = self.get(page_hash, model_version)
+        if value is None:
+            value = compute(data)
+            # The result belongs to the model that computed it, never store it
+            # once the version has moved on
+            if self.model_version == model_version:
+                self.set(page_hash, value, model_version)
+        return value
+
+    def set_model_version(self, model_version: str) -> None:
+        if model_version == self.model_version:
+            return
+        self.model_version = model_version
+        self.memory.clear()
+        self.prune()
+
+    def prune(self) -> None:
+        """
+        Drops backend entries written by any other model version.
+        """
+        if self.backend is not None:
+            self.backend.clear(keep_version=self.model_version)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            hits = self._memory_hits + self._backend_hits
+            total = hits + self._misses
+            return CacheStats(
+                memory_hits=self._memory_hits,
+                backend_hits=self._backend_hits,
+                misses=self._misses,
+                hit_rate=hits / total if total else 0.0
+            )
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._memory_hits = 0
+            self._backend_hits = 0
+            self._misses = 0
+
+
+@lru_cache(maxsize=1)
+def get_result_cache() -> ResultCache:
+    backend: CacheStore | None
+    if VISOCR_CACHE_BACKEND == "redis":
+        # Imported lazily so the memory and disk tiers work without redis installed
+        try:
+            from redis import Redis
+        except ImportError as e:
+            raise ImportError(
+                "VISOCR_CACHE_BACKEND=redis requires the 'redis' extra: pip install 'visocr[redis]'"
+            ) from e
+
+        backend = RedisStore(
+            client=Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB),
+            ttl=VISOCR_CACHE_TTL
+        )
+    elif VISOCR_CACHE_BACKEND == "disk":
+        backend = DiskStore(
+            VISOCR_CACHE_PATH,
+            ttl=VISOCR_CACHE_TTL,
+            sweep_interval=VISOCR_CACHE_SWEEP_INTERVAL
+        )
+    else:
+        backend = None
+
+    cache = ResultCache(
+        model_version=VISOCR_MODEL_VERSION,
+        backend=backend,
+        memory_size=VISOCR_CACHE_MEMORY_SIZE
+    )
+    # The version usually changes through VISOCR_MODEL_VERSION and a restart,
+    # so entries of older versions are dropped on startup
+    cache.prune()
+    return cache